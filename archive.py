@@ -0,0 +1,195 @@
+"""Per-term archival of Transaction rows.
+
+Transactions from closed academic terms are moved out of the live table into
+one SQLite file per term (ARCHIVE_DIR/transactions_<term>.db). Balances live
+on User and are never touched; each archived term keeps a count/sum snapshot
+in ArchivedTerm, verified against the archive before the live rows are
+deleted. transaction_history() reads the live table and only opens the
+archives whose term overlaps the requested range.
+
+    flask --app wsgi archive-transactions
+"""
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import create_engine, func, select
+
+from models import db, User, Transaction, ArchivedTerm
+
+Term = namedtuple('Term', 'name start end')
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def init_app(app):
+    app.config.setdefault('ARCHIVE_DIR', os.path.join(app.instance_path, 'archives'))
+    app.config.setdefault('ARCHIVE_TERM_START_MONTHS', (1, 7))
+    app.config.setdefault('ARCHIVE_KEEP_TERMS', 1)
+    app.config.setdefault('ARCHIVE_BATCH_SIZE', 1000)
+    app.cli.add_command(archive_transactions_command)
+
+# --- TERMS ---
+
+def term_for(dt, start_months=None):
+    """Return the academic Term containing ``dt``."""
+    months = sorted(start_months or current_app.config['ARCHIVE_TERM_START_MONTHS'])
+    year = dt.year
+    idx = max((i for i, m in enumerate(months) if m <= dt.month), default=None)
+    if idx is None:
+        # Before the first term start of the year: still in last year's final term
+        year -= 1
+        idx = len(months) - 1
+    start = datetime(year, months[idx], 1)
+    if idx + 1 < len(months):
+        end = datetime(year, months[idx + 1], 1)
+    else:
+        end = datetime(year + 1, months[0], 1)
+    return Term(f"{year}-T{idx + 1}", start, end)
+
+def previous_term(term):
+    return term_for(term.start - timedelta(days=1))
+
+def archivable_terms(now=None):
+    """Closed terms older than the ARCHIVE_KEEP_TERMS most recent ones that still have live rows."""
+    now = now or datetime.utcnow()
+    cutoff = term_for(now)
+    for _ in range(current_app.config['ARCHIVE_KEEP_TERMS']):
+        cutoff = previous_term(cutoff)
+
+    oldest = db.session.query(func.min(Transaction.timestamp)).scalar()
+    terms = []
+    if oldest is None:
+        return terms
+    term = term_for(oldest)
+    while term.start < cutoff.start:
+        terms.append(term)
+        term = term_for(term.end)
+    return terms
+
+# --- ARCHIVE DATABASES ---
+
+def _archive_path(term_name):
+    return os.path.join(current_app.config['ARCHIVE_DIR'], f"transactions_{term_name}.db")
+
+def _archive_engine(path):
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine is None:
+            engine = create_engine(f"sqlite:///{path}")
+            _engines[path] = engine
+        return engine
+
+def archive_term(term):
+    """Move one term's Transaction rows into its archive DB. Returns the ArchivedTerm or None."""
+    table = Transaction.__table__
+    in_term = (table.c.timestamp >= term.start) & (table.c.timestamp < term.end)
+
+    live_count, live_total = db.session.execute(
+        select(func.count(), func.coalesce(func.sum(table.c.amount), 0)).where(in_term)
+    ).one()
+    if not live_count:
+        return None
+
+    path = _archive_path(term.name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    engine = _archive_engine(path)
+    table.create(engine, checkfirst=True)
+
+    # Copy first. Rows keep their ids, so re-running after a crash is a no-op.
+    batch_size = current_app.config['ARCHIVE_BATCH_SIZE']
+    result = db.session.execute(select(table).where(in_term).order_by(table.c.id))
+    with engine.begin() as conn:
+        for rows in result.mappings().partitions(batch_size):
+            conn.execute(table.insert().prefix_with('OR REPLACE'), [dict(r) for r in rows])
+
+    snapshot = ArchivedTerm.query.filter_by(name=term.name).first()
+    prior_count = snapshot.tx_count if snapshot else 0
+    prior_total = snapshot.tx_total if snapshot else 0
+
+    with engine.connect() as conn:
+        arch_count, arch_total = conn.execute(
+            select(func.count(), func.coalesce(func.sum(table.c.amount), 0))
+        ).one()
+    if (arch_count, arch_total) != (prior_count + live_count, prior_total + live_total):
+        db.session.rollback()
+        raise RuntimeError(f"Archive {path} does not match live rows for {term.name}; nothing deleted")
+
+    # Delete from live and record the snapshot in a single commit
+    db.session.execute(table.delete().where(in_term))
+    if not snapshot:
+        snapshot = ArchivedTerm(name=term.name, start=term.start, end=term.end, path=path)
+        db.session.add(snapshot)
+    snapshot.tx_count = arch_count
+    snapshot.tx_total = arch_total
+    snapshot.archived_at = datetime.utcnow()
+    db.session.commit()
+    return snapshot
+
+def archive_old_transactions(now=None):
+    return [s for s in (archive_term(t) for t in archivable_terms(now)) if s]
+
+# --- HISTORY ---
+
+def transaction_history(user_id=None, start=None, end=None, limit=None, sent_only=False):
+    """Transactions for ``user_id`` (or everyone) in [start, end), newest first.
+    ``sent_only`` keeps only the ones ``user_id`` sent.
+
+    Rows come back as dicts with the Transaction columns. Archives are only
+    opened for terms overlapping the range, newest first, and not at all once
+    ``limit`` rows have been found.
+    """
+    table = Transaction.__table__
+    stmt = select(table).order_by(table.c.timestamp.desc(), table.c.id.desc())
+    if user_id is not None and sent_only:
+        stmt = stmt.where(table.c.sender_id == user_id)
+    elif user_id is not None:
+        stmt = stmt.where((table.c.sender_id == user_id) | (table.c.receiver_id == user_id))
+    if start is not None:
+        stmt = stmt.where(table.c.timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(table.c.timestamp < end)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    rows = [dict(r) for r in db.session.execute(stmt).mappings()]
+
+    terms = ArchivedTerm.query
+    if start is not None:
+        terms = terms.filter(ArchivedTerm.end > start)
+    if end is not None:
+        terms = terms.filter(ArchivedTerm.start < end)
+    for term in terms.order_by(ArchivedTerm.start.desc()):
+        if limit is not None and len(rows) >= limit:
+            break
+        if not os.path.exists(term.path):
+            continue
+        with _archive_engine(term.path).connect() as conn:
+            rows.extend(dict(r) for r in conn.execute(stmt).mappings())
+
+    rows.sort(key=lambda r: (r['timestamp'], r['id']), reverse=True)
+    return rows[:limit] if limit is not None else rows
+
+def with_users(rows):
+    """Attach ``sender`` / ``receiver`` Users to history rows (one query), for templates."""
+    ids = {r['sender_id'] for r in rows} | {r['receiver_id'] for r in rows}
+    users = {u.id: u for u in User.query.filter(User.id.in_(ids))} if ids else {}
+    for r in rows:
+        r['sender'] = users.get(r['sender_id'])
+        r['receiver'] = users.get(r['receiver_id'])
+    return rows
+
+# --- CLI ---
+
+@click.command('archive-transactions')
+def archive_transactions_command():
+    """Move Transaction rows from closed terms into per-term archive DBs."""
+    archived = archive_old_transactions()
+    for snapshot in archived:
+        click.echo(f"{snapshot.name}: {snapshot.tx_count} transactions, {snapshot.tx_total} coins -> {snapshot.path}")
+    if not archived:
+        click.echo("Nothing to archive.")
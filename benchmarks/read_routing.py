@@ -0,0 +1,158 @@
+"""Dashboard latency under concurrent transfer load, with and without read routing.
+
+For each mode a fresh SQLite database is seeded, then writer threads post
+/teacher/transfer in a loop while reader threads fetch /principal. Modes:
+
+    off      all queries on the primary (default rollback journal)
+    off-wal  all queries on the primary, primary in WAL mode
+    on       @read_only dashboards read from a mode=ro WAL connection
+
+    python benchmarks/read_routing.py --seconds 10 --writers 4 --readers 4
+
+All threads share one interpreter, so this shows lock contention between
+readers and writers, not multi-process throughput.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+
+def build_app(mode, db_path, students):
+    from config import Config
+    from app import create_app, init_db
+    from models import db, User, Branch, ClassRoom
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        READ_ROUTING_ENABLED = mode == 'on'
+        SQLALCHEMY_READ_DATABASE_URI = None
+        RATELIMIT_ENABLED = False
+        FRAGMENT_CACHE_ENABLED = False  # measure the queries, not the cache
+        SCHEDULER_ENABLED = False
+        SESSION_BACKEND = 'cookie'
+
+    app = create_app(BenchConfig)
+    init_db(app)
+    with app.app_context():
+        if mode == 'off-wal':
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+        branch = Branch(name='Bench')
+        db.session.add(branch)
+        db.session.flush()
+        classroom = ClassRoom(name='B-1', branch_id=branch.id)
+        db.session.add(classroom)
+        db.session.flush()
+        password = generate_password_hash('bench', method='pbkdf2:sha256:1000')
+        for i in range(students):
+            db.session.add(User(email=f's{i}@bench', name=f'S{i}', role='student', password=password,
+                                class_id=classroom.id, branch_id=branch.id))
+        db.session.commit()
+        branch_id = branch.id
+    return app, branch_id, password
+
+
+def login(app, email, password='bench'):
+    client = app.test_client()
+    client.post('/login', data={'email': email, 'password': password})
+    return client
+
+
+def run_mode(mode, args):
+    from models import db, User
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, branch_id, password = build_app(mode, os.path.join(tmp, 'bench.db'), args.students)
+        with app.app_context():
+            for i in range(args.writers):
+                db.session.add(User(email=f't{i}@bench', name=f'T{i}', role='teacher', password=password,
+                                    branch_id=branch_id, balance=10 ** 9))
+            db.session.commit()
+            student_ids = [u.id for u in User.query.filter_by(role='student')]
+
+        stop = threading.Event()
+        latencies, transfers, errors = [], [0], [0]
+        lock = threading.Lock()
+
+        def writer(i):
+            client = login(app, f't{i}@bench')
+            n = 0
+            while not stop.is_set():
+                try:
+                    client.post('/teacher/transfer', data={'receiver_id': student_ids[n % len(student_ids)],
+                                                           'amount': 1, 'reason': 'bench'})
+                    with lock:
+                        transfers[0] += 1
+                except Exception:
+                    with lock:
+                        errors[0] += 1
+                n += 1
+
+        def reader():
+            client = login(app, 'principal@school.com', 'admin')
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    status = client.get('/principal').status_code
+                except Exception:
+                    status = None
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if status == 200:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+            if app.extensions.get('db_routing') is not None:
+                app.extensions['db_routing'].dispose()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else float('nan')
+    return {
+        'dashboards': len(latencies),
+        'p50': pct(0.50),
+        'p95': pct(0.95),
+        'max': latencies[-1] * 1000 if latencies else float('nan'),
+        'transfers': transfers[0],
+        'errors': errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--modes', default='off,off-wal,on')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    print(f"{'mode':>8}  {'dashboards':>10}  {'p50':>8}  {'p95':>8}  {'max':>8}  {'transfers':>9}  errors")
+    for mode in args.modes.split(','):
+        r = run_mode(mode, args)
+        print(f"{mode:>8}  {r['dashboards']:>10}  {r['p50']:>6.1f}ms  {r['p95']:>6.1f}ms  {r['max']:>6.1f}ms  "
+              f"{r['transfers']:>9}  {r['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Worker cold-start benchmark.
+
+Boots N fresh interpreters with ``python -X importtime``, each of which
+imports the app, calls create_app() and serves its first request through the
+test client. Reports time-to-first-request per worker plus the slowest imports.
+
+    python benchmarks/startup.py --workers 4 --path /login
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = r"""
+import time, sys
+t0 = time.perf_counter()
+from app import create_app
+t_import = time.perf_counter()
+app = create_app()
+t_create = time.perf_counter()
+resp = app.test_client().get(sys.argv[1])
+t_first = time.perf_counter()
+print(f"{t_import - t0:.6f} {t_create - t0:.6f} {t_first - t0:.6f} {resp.status_code}")
+"""
+
+
+def parse_importtime(stderr):
+    """Return [(cumulative_us, module)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:   self_us |   cumulative_us | module"
+        _, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), module.strip()))
+    return rows
+
+
+def init_db(db_uri):
+    env = dict(os.environ, DATABASE_URL=db_uri)
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi', 'init-db'],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def run_worker(path, db_uri):
+    env = dict(os.environ, DATABASE_URL=db_uri)
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', WORKER, path],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+    t_import, t_create, t_first, status = proc.stdout.split()
+    return float(t_import), float(t_create), float(t_first), int(status), parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--path', default='/login')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        init_db(db_uri)
+        print(f"{'worker':>6}  {'import':>9}  {'create_app':>10}  {'first_req':>9}  status")
+        results = []
+        for i in range(args.workers):
+            t_import, t_create, t_first, status, imports = run_worker(args.path, db_uri)
+            results.append(t_first)
+            print(f"{i:>6}  {t_import * 1000:>7.1f}ms  {t_create * 1000:>8.1f}ms  {t_first * 1000:>7.1f}ms  {status}")
+
+    print(f"\nmean time-to-first-request: {sum(results) / len(results) * 1000:.1f}ms")
+    print(f"\nslowest imports (last worker, cumulative):")
+    for cumulative_us, module in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f}ms  {module}")
+    heavy = [m for _, m in imports if m.split('.')[0] in ('qrcode', 'PIL')]
+    print(f"\nqrcode/Pillow imported at boot: {'yes' if heavy else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
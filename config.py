@@ -1,9 +1,54 @@
 import os
+from datetime import timedelta
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-this-in-production'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///scholarcash_v2.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    
-    # For development
-    DEBUG = True
\ No newline at end of file
+
+    # Transaction archival: terms start on these months; keep this many
+    # closed terms live before moving them to ARCHIVE_DIR (defaults to instance/archives)
+    ARCHIVE_TERM_START_MONTHS = (1, 7)
+    ARCHIVE_KEEP_TERMS = 1
+    if os.environ.get('ARCHIVE_DIR'):
+        ARCHIVE_DIR = os.environ['ARCHIVE_DIR']
+
+    # Number of reverse proxies (nginx, load balancer) in front of the app whose
+    # X-Forwarded-For / X-Forwarded-Proto headers are trusted. 0 = direct clients.
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', '0'))
+
+    # Token-bucket limits ("N/second|minute|hour|day") per limited route: per user
+    # (per email for /login), and per client IP. A whole staff room or school NAT
+    # shares one IP, so the IP limits are only a ceiling against floods.
+    # Use RATELIMIT_STORAGE=sqlite:///path/ratelimit.db to share buckets across workers.
+    RATELIMIT_ENABLED = True
+    RATELIMIT_STORAGE = os.environ.get('RATELIMIT_STORAGE') or 'memory'
+    RATELIMIT_LIMITS = {
+        'login': '10/minute',
+        'transfer': '30/minute',
+        'buy': '20/minute',
+    }
+    RATELIMIT_IP_LIMITS = {
+        'login': '100/minute',
+        'transfer': '600/minute',
+        'buy': '400/minute',
+    }
+
+    # Recurring allocations: background thread per worker (runs are de-duplicated
+    # in the DB). With gunicorn --preload, use 'flask run-allocations' from cron instead.
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+    SCHEDULER_POLL_SECONDS = 60
+    SCHEDULER_MAX_CATCHUP = 52
+
+    # Sessions: 'cookie' (Flask default), 'memory' (single worker / sticky)
+    # or 'sqlalchemy' (server-side table shared by all workers)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND') or 'cookie'
+    SESSION_TTL = timedelta(hours=12)
+    SESSION_SWEEP_SECONDS = 10
+
+    # Read routing: @read_only GET views read from READ_DATABASE_URL, or for a
+    # SQLite primary from a read-only WAL connection to the same file. A user
+    # who just wrote keeps reading the primary for READ_YOUR_WRITES_SECONDS.
+    READ_ROUTING_ENABLED = os.environ.get('READ_ROUTING_ENABLED', '1') == '1'
+    SQLALCHEMY_READ_DATABASE_URI = os.environ.get('READ_DATABASE_URL')
+    READ_YOUR_WRITES_SECONDS = 10
@@ -0,0 +1,98 @@
+"""Read/write routing for db.session.
+
+Views decorated with @read_only (GET dashboards, history export) run their
+SELECTs on a read engine; everything else, and any INSERT/UPDATE/DELETE or
+flush, uses the primary. The read engine is SQLALCHEMY_READ_DATABASE_URI
+(e.g. a replica), or for a SQLite file primary a read-only ``mode=ro``
+connection to the same file with the primary switched to WAL, so dashboard
+readers never wait on the transfer writers' lock.
+
+Read-your-writes: a request that writes stamps the user's session, and that
+user's reads stay on the primary for READ_YOUR_WRITES_SECONDS, so the
+dashboard after a transfer never shows the pre-transfer balance from a
+lagging replica.
+"""
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql.dml import UpdateBase
+
+RYW_KEY = '_rw_until'
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not isinstance(clause, UpdateBase) and _route_to_replica(self):
+            return current_app.extensions['db_routing']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _route_to_replica(db_session):
+    if not has_request_context() or not g.get('_db_read_only'):
+        return False
+    if db_session._flushing or db_session.new or db_session.dirty or db_session.deleted:
+        return False
+    return current_app.extensions.get('db_routing') is not None
+
+
+def read_only(view):
+    """Serve this view's queries from the read engine unless the user just wrote."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if request.method == 'GET' and session.get(RYW_KEY, 0) < time.time():
+            g._db_read_only = True
+        return view(*args, **kwargs)
+    return wrapped
+
+# --- WRITE TRACKING (read-your-writes) ---
+
+def _mark_write(*args, **kwargs):
+    if has_request_context():
+        g._db_wrote = True
+
+def _mark_orm_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        _mark_write()
+
+def _stamp_session(response):
+    if g.get('_db_wrote') and current_user.is_authenticated:
+        session[RYW_KEY] = time.time() + current_app.config['READ_YOUR_WRITES_SECONDS']
+    return response
+
+# --- SETUP ---
+
+def _read_engine_for(app, db):
+    uri = app.config.get('SQLALCHEMY_READ_DATABASE_URI')
+    if uri:
+        return create_engine(uri)
+
+    primary = db.engine
+    path = primary.url.database
+    if primary.url.get_backend_name() != 'sqlite' or not path or path == ':memory:':
+        return None
+
+    # WAL lets the read-only connections read while a transfer holds the write lock
+    with primary.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+    return create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+
+def init_app(app, db):
+    app.config.setdefault('READ_ROUTING_ENABLED', True)
+    app.config.setdefault('SQLALCHEMY_READ_DATABASE_URI', None)
+    app.config.setdefault('READ_YOUR_WRITES_SECONDS', 10)
+
+    engine = None
+    if app.config['READ_ROUTING_ENABLED']:
+        with app.app_context():
+            engine = _read_engine_for(app, db)
+    app.extensions['db_routing'] = engine
+
+    if not getattr(RoutingSession, '_write_listeners', False):
+        event.listen(RoutingSession, 'after_flush', _mark_write)
+        event.listen(RoutingSession, 'do_orm_execute', _mark_orm_write)
+        RoutingSession._write_listeners = True
+    app.after_request(_stamp_session)
@@ -0,0 +1,130 @@
+"""Render caching for the slow-changing parts of the dashboards.
+
+Every entity type (branches, classes, staff, students, store) has a version
+counter in the DataVersion table. Routes that add/edit/delete those rows call
+bump() before their commit, so the new version becomes visible together with
+the data. A template wraps a section in
+
+    {% call cached_fragment('staff_list', 'staff', 'branches', 'classes') %}
+        ...
+    {% endcall %}
+
+and the rendered HTML is reused until one of the listed versions changes.
+Pass the section's data as LazyQuery objects so a cache hit skips the query too.
+Balances and recent transactions change on every transfer and stay outside
+the cached sections.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g
+from markupsafe import Markup
+
+from models import db, DataVersion
+
+ENTITIES = ('branches', 'classes', 'staff', 'students', 'store')
+
+# --- VERSIONS ---
+
+def load_versions():
+    """Read all entity versions once per request.
+
+    Call at the top of a view, before its data queries, so a section is never
+    stored under a version newer than the data it was rendered from.
+    """
+    if '_data_versions' not in g:
+        g._data_versions = dict(db.session.query(DataVersion.entity, DataVersion.version).all())
+    return g._data_versions
+
+def bump(*entities):
+    """Invalidate cached sections built from ``entities``. Commits with the caller's session."""
+    for entity in entities:
+        updated = DataVersion.query.filter_by(entity=entity).update(
+            {DataVersion.version: DataVersion.version + 1}, synchronize_session=False)
+        if not updated:
+            db.session.add(DataVersion(entity=entity, version=1))
+
+def seed_versions():
+    for entity in ENTITIES:
+        if not DataVersion.query.get(entity):
+            db.session.add(DataVersion(entity=entity, version=0))
+    db.session.commit()
+
+# --- CACHE ---
+
+class FragmentCache:
+    """Small per-process LRU of rendered HTML keyed by (name, scope, versions)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def set(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+cache = FragmentCache()
+
+
+def cached_fragment(name, *entities, scope=None, caller=None):
+    """Jinja global used with {% call %}; ``scope`` separates per-user variants."""
+    if not current_app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        return caller()
+    versions = load_versions()
+    key = (name, scope) + tuple(versions.get(e, 0) for e in entities)
+    html = cache.get(key)
+    if html is None:
+        html = Markup(caller())
+        cache.set(key, html)
+    return html
+
+class LazyQuery:
+    """Wrap a query so it only runs (once) if a template actually iterates it."""
+
+    def __init__(self, query):
+        self._query = query
+        self._rows = None
+
+    def _load(self):
+        if self._rows is None:
+            self._rows = self._query.all()
+        return self._rows
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __bool__(self):
+        return bool(self._load())
+
+
+def init_app(app):
+    app.config.setdefault('FRAGMENT_CACHE_ENABLED', True)
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
@@ -1,8 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # --- 1. ORGANIZATIONAL STRUCTURE ---
 class Branch(db.Model):
@@ -50,6 +51,63 @@ class Transaction(db.Model):
     sender = db.relationship('User', foreign_keys=[sender_id], backref='sent_tx')
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref='received_tx')
 
+# --- 4. RECURRING ALLOCATIONS ---
+class RecurringAllocation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    branch_id = db.Column(db.Integer, db.ForeignKey('branch.id'), nullable=True)  # None = all branches
+    target_role = db.Column(db.String(20), nullable=False)  # teacher / tutor / hod / staff (all three)
+    amount = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(200))
+    frequency = db.Column(db.String(20), nullable=False)  # daily / weekly / monthly
+    next_run_at = db.Column(db.DateTime, nullable=False)
+    anchor_day = db.Column(db.Integer)  # day of month of the first run; monthly runs clamp from it
+    active = db.Column(db.Boolean, default=True)
+    branch = db.relationship('Branch')
+    runs = db.relationship('AllocationRun', backref='schedule', lazy='dynamic',
+                           order_by='AllocationRun.scheduled_for.desc()')
+
+class AllocationRun(db.Model):
+    # One row per applied occurrence; the unique key is what stops a run being applied twice
+    __table_args__ = (db.UniqueConstraint('schedule_id', 'scheduled_for'),)
+    id = db.Column(db.Integer, primary_key=True)
+    schedule_id = db.Column(db.Integer, db.ForeignKey('recurring_allocation.id'), nullable=False)
+    scheduled_for = db.Column(db.DateTime, nullable=False)
+    executed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    recipients = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer, default=0)
+
+# --- 5. SERVER-SIDE SESSIONS (SESSION_BACKEND = 'sqlalchemy') ---
+class ServerSession(db.Model):
+    sid = db.Column(db.String(32), primary_key=True)
+    gen = db.Column(db.Integer, nullable=False, default=0)
+    user_id = db.Column(db.Integer, index=True)
+    data = db.Column(db.Text, nullable=False)
+    expires = db.Column(db.DateTime, nullable=False, index=True)
+
+# Forced logouts, polled by every worker to drop its cached sessions for the user
+class SessionRevocation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+# Bumped whenever rows of an entity type change; keys the dashboard fragment cache
+class DataVersion(db.Model):
+    entity = db.Column(db.String(30), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+# Snapshot of an academic term whose Transaction rows were moved to an archive DB
+class ArchivedTerm(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(20), unique=True, nullable=False)  # e.g. "2025-T1"
+    start = db.Column(db.DateTime, nullable=False)
+    end = db.Column(db.DateTime, nullable=False)
+    path = db.Column(db.String(300), nullable=False)
+    tx_count = db.Column(db.Integer, default=0)
+    tx_total = db.Column(db.Integer, default=0)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class StoreItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100))
@@ -0,0 +1,219 @@
+"""Token-bucket rate limiting for login and money-moving routes.
+
+Each limited request takes one token from a per-user bucket
+(RATELIMIT_LIMITS) and one from a per-IP bucket (RATELIMIT_IP_LIMITS); it
+is only allowed if both have a token. The IP limits are set much higher,
+since a staff room or a school NAT puts many users behind one address.
+Behind a reverse proxy set TRUSTED_PROXIES so the client address comes from
+X-Forwarded-For instead of the proxy's. Rejected requests
+get an immediate 429 with Retry-After, before any database write is
+attempted, so a burst can't pile up behind the SQLite writer lock or the
+pbkdf2 check in /login.
+
+Buckets live in process memory by default. With several gunicorn workers
+set RATELIMIT_STORAGE to a ``sqlite:///path`` URI so all workers share one
+small bucket DB (kept separate from the app database on purpose).
+
+    @bp.route('/teacher/transfer', methods=['POST'])
+    @login_required
+    @limiter.limit('transfer')
+    def transfer_coins(): ...
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, request
+from flask_login import current_user
+
+
+def parse_limit(value):
+    """'10/minute' -> (capacity, refill tokens per second)."""
+    count, _, period = value.partition('/')
+    seconds = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}[period.strip()]
+    count = int(count)
+    return count, count / seconds
+
+# --- STORES ---
+
+class MemoryStore:
+    """Per-process buckets. Idle buckets are dropped once they'd be full again."""
+
+    def __init__(self, max_keys=10000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def consume(self, buckets):
+        """Take a token from every ``(key, capacity, rate)`` bucket, or from none."""
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            for key, capacity, rate in buckets:
+                tokens, updated, _ = self._buckets.get(key, (capacity, now, None))
+                levels.append(min(capacity, tokens + (now - updated) * rate))
+            allowed = all(t >= 1 for t in levels)
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                # Keep the bucket's own refill time so pruning doesn't depend on the calling route
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now, capacity / rate)
+            if len(self._buckets) > self._max_keys:
+                self._prune(now)
+        return allowed, _retry_after(buckets, levels)
+
+    def _prune(self, now):
+        for key in [k for k, (_, updated, refill) in self._buckets.items() if now - updated > refill]:
+            del self._buckets[key]
+
+
+class SQLiteStore:
+    """Buckets shared between worker processes through a small SQLite file.
+
+    Each row keeps the time at which its bucket is full again; rows past it
+    carry no state and are deleted every ``prune_seconds``, so keys posted by
+    anonymous clients (``login:email:<anything>``) don't pile up.
+    """
+
+    def __init__(self, path, busy_timeout_ms=50, prune_seconds=60):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.prune_seconds = prune_seconds
+        self._local = threading.local()
+        self._next_prune = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _conn(self):
+        # Opened lazily and per process: with gunicorn --preload, workers must not
+        # share a connection inherited across fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(buckets)')]
+            if columns and 'full_at' not in columns:
+                conn.execute('DROP TABLE buckets')  # pre-pruning layout; bucket state is disposable
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                         'updated REAL NOT NULL, full_at REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def consume(self, buckets):
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            levels = []
+            for key, capacity, rate in buckets:
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                levels.append(min(capacity, tokens + (now - updated) * rate))
+            allowed = all(t >= 1 for t in levels)
+            rows = []
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                tokens = tokens - 1 if allowed else tokens
+                rows.append((key, tokens, now, now + (capacity - tokens) / rate))
+            conn.executemany('INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                             rows)
+            if now >= self._next_prune:
+                conn.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+                self._next_prune = now + self.prune_seconds
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, _retry_after(buckets, levels)
+
+
+def _retry_after(buckets, levels):
+    """Seconds until every empty bucket has refilled one token."""
+    waits = [(1 - t) / rate for (_, _, rate), t in zip(buckets, levels) if t < 1]
+    return max(1, math.ceil(max(waits))) if waits else 0
+
+# --- LIMITER ---
+
+class RateLimiter:
+    def __init__(self, app=None):
+        self.store = None
+        self.counters = Counter()
+        self._counters_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_ENABLED', True)
+        app.config.setdefault('RATELIMIT_STORAGE', 'memory')
+        app.config.setdefault('RATELIMIT_LIMITS', {})
+        app.config.setdefault('RATELIMIT_IP_LIMITS', {})
+        storage = app.config['RATELIMIT_STORAGE']
+        if storage.startswith('sqlite:///'):
+            self.store = SQLiteStore(storage[len('sqlite:///'):])
+        else:
+            self.store = MemoryStore()
+        app.extensions['ratelimit'] = self
+
+    def _count(self, name, outcome):
+        with self._counters_lock:
+            self.counters[(name, outcome)] += 1
+
+    def stats(self):
+        """{route_name: {'allowed': n, 'limited': n, 'errors': n}} for monitoring."""
+        with self._counters_lock:
+            snapshot = dict(self.counters)
+        out = {}
+        for (name, outcome), n in snapshot.items():
+            out.setdefault(name, {'allowed': 0, 'limited': 0, 'errors': 0})[outcome] = n
+        return out
+
+    def _buckets(self, name, config):
+        """[(key, capacity, rate)] for the per-user and (if configured) per-IP limits."""
+        buckets = []
+        limit = config['RATELIMIT_LIMITS'].get(name)
+        if limit:
+            if current_user.is_authenticated:
+                user = f"user:{current_user.id}"
+            else:
+                # /login: limit guesses against one account as well as per client
+                user = f"email:{(request.form.get('email') or '').strip().lower()}"
+            buckets.append((f"{name}:{user}", *parse_limit(limit)))
+        ip_limit = config['RATELIMIT_IP_LIMITS'].get(name)
+        if ip_limit:
+            buckets.append((f"{name}:ip:{request.remote_addr}", *parse_limit(ip_limit)))
+        return buckets
+
+    def limit(self, name, methods=None):
+        """Limit a view using RATELIMIT_LIMITS[name] and RATELIMIT_IP_LIMITS[name];
+        ``methods`` restricts which verbs count."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                config = current_app.config
+                if not config['RATELIMIT_ENABLED'] or (methods and request.method not in methods):
+                    return view(*args, **kwargs)
+                buckets = self._buckets(name, config)
+                if not buckets:
+                    return view(*args, **kwargs)
+
+                try:
+                    allowed, retry_after = self.store.consume(buckets)
+                except sqlite3.Error:
+                    # A stuck limiter store must not take the route down with it
+                    self._count(name, 'errors')
+                    return view(*args, **kwargs)
+
+                if not allowed:
+                    self._count(name, 'limited')
+                    return "Too Many Requests", 429, {'Retry-After': str(retry_after)}
+                self._count(name, 'allowed')
+                return view(*args, **kwargs)
+            return wrapped
+        return decorator
+
+
+limiter = RateLimiter()
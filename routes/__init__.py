@@ -0,0 +1,10 @@
+from routes import auth, principal, teacher, student, mobile, history, metrics
+
+# One blueprint per role. URLs are unchanged from the single-module app,
+# so templates keep their hard-coded paths.
+BLUEPRINTS = (auth.bp, principal.bp, teacher.bp, student.bp, mobile.bp, history.bp, metrics.bp)
+
+
+def register_blueprints(app):
+    for bp in BLUEPRINTS:
+        app.register_blueprint(bp)
@@ -0,0 +1,84 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, login_required, logout_user, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
+from models import db, User, ClassRoom
+from ratelimit import limiter
+from fragment_cache import bump
+
+bp = Blueprint('auth', __name__)
+
+# --- AUTH & HOME ROUTES ---
+
+@bp.route('/')
+def home():
+    if not current_user.is_authenticated:
+        return redirect(url_for('auth.login'))
+
+    if current_user.role == 'principal':
+        return redirect(url_for('principal.dashboard_principal'))
+    elif current_user.role in ['teacher', 'tutor', 'hod']:
+        return redirect(url_for('teacher.dashboard_teacher'))
+    elif current_user.role == 'student':
+        return redirect(url_for('student.dashboard_student'))
+    return "Unknown Role", 403
+
+@bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit('login', methods=['POST'])
+def login():
+    if request.method == 'POST':
+        email = request.form.get('email')
+        password = request.form.get('password')
+        user = User.query.filter_by(email=email).first()
+        if user and check_password_hash(user.password, password):
+            login_user(user)
+
+            # Check if mobile device
+            user_agent = request.headers.get('User-Agent', '').lower()
+            is_mobile = any(device in user_agent for device in ['mobile', 'android', 'iphone', 'ipad'])
+
+            if user.role in ['teacher', 'tutor', 'hod'] and is_mobile:
+                return redirect(url_for('mobile.mobile_dashboard'))
+
+            return redirect(url_for('auth.home'))
+        flash("Invalid Credentials", "error")
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
+
+# --- UPDATE: Add this Register Route ---
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.home'))
+
+    if request.method == 'POST':
+        name = request.form.get('name')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        class_id = request.form.get('class_id')
+
+        if User.query.filter_by(email=email).first():
+            flash("Email already exists", "error")
+        else:
+            # Create Student
+            new_student = User(name=name, email=email, role='student',
+                               password=generate_password_hash(password, method='pbkdf2:sha256'),
+                               class_id=int(class_id))
+
+            # Auto-link to Branch
+            cls = ClassRoom.query.get(int(class_id))
+            new_student.branch_id = cls.branch_id
+
+            db.session.add(new_student)
+            bump('students')
+            db.session.commit()
+            flash("Registration successful! Please login.", "success")
+            return redirect(url_for('auth.login'))
+
+    # Load classes for dropdown
+    classes = ClassRoom.query.all()
+    return render_template('register.html', classes=classes)
@@ -0,0 +1,39 @@
+from flask import Blueprint, request, Response
+from flask_login import login_required, current_user
+from datetime import datetime
+import csv
+from io import StringIO
+from archive import transaction_history
+from db_routing import read_only
+
+bp = Blueprint('history', __name__)
+
+# --- HISTORY EXPORT (live table + term archives) ---
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+@bp.route('/history/export')
+@login_required
+@read_only
+def export_history():
+    """CSV of transactions in [start, end). Principal can export any user or everyone."""
+    try:
+        start = _parse_date(request.args.get('start'))
+        end = _parse_date(request.args.get('end'))
+    except ValueError:
+        return "Dates must be YYYY-MM-DD", 400
+
+    user_id = current_user.id
+    if current_user.role == 'principal':
+        user_id = request.args.get('user_id', type=int)
+
+    rows = transaction_history(user_id=user_id, start=start, end=end)
+
+    out = StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['id', 'timestamp', 'sender_id', 'receiver_id', 'amount', 'reason'])
+    for r in rows:
+        writer.writerow([r['id'], r['timestamp'], r['sender_id'], r['receiver_id'], r['amount'], r['reason']])
+    return Response(out.getvalue(), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=history.csv'})
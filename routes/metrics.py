@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required, current_user
+from ratelimit import limiter
+import fragment_cache
+
+bp = Blueprint('metrics', __name__)
+
+# --- MONITORING ---
+
+@bp.route('/metrics/ratelimit')
+@login_required
+def ratelimit_metrics():
+    """Allowed / limited / store-error counts per limited route (this worker only)."""
+    if current_user.role != 'principal': return "Denied", 403
+    return jsonify(limiter.stats())
+
+@bp.route('/metrics/fragments')
+@login_required
+def fragment_metrics():
+    """Dashboard fragment cache hits / misses / entries (this worker only)."""
+    if current_user.role != 'principal': return "Denied", 403
+    return jsonify(fragment_cache.cache.stats())
@@ -0,0 +1,98 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from models import db, User, ClassRoom, Transaction
+from ratelimit import limiter
+from db_routing import read_only
+from archive import transaction_history, with_users
+
+bp = Blueprint('mobile', __name__)
+
+# --- MOBILE ROUTES ---
+
+@bp.route('/mobile')
+@login_required
+@read_only
+def mobile_dashboard():
+    """Mobile-optimized money transfer interface"""
+    if current_user.role not in ['teacher', 'tutor', 'hod']:
+        return "Denied", 403
+    
+    # Get students based on role
+    students = []
+    if current_user.role == 'tutor' and current_user.tutor_of_class:
+        for cls in current_user.tutor_of_class:
+            students.extend(User.query.filter_by(role='student', class_id=cls.id).all())
+    elif current_user.branch_id:
+        branch_classes = ClassRoom.query.filter_by(branch_id=current_user.branch_id).all()
+        class_ids = [c.id for c in branch_classes]
+        if class_ids:
+            students = User.query.filter(User.role == 'student', User.class_id.in_(class_ids)).all()
+    
+    # Remove duplicates
+    seen = set()
+    unique_students = []
+    for s in students:
+        if s.id not in seen:
+            seen.add(s.id)
+            unique_students.append(s)
+    students = unique_students
+    
+    # Get recent transactions
+    transactions = with_users(transaction_history(user_id=current_user.id, limit=10))
+    
+    return render_template('mobile_transfer.html', 
+                         students=students, 
+                         transactions=transactions)
+
+
+@bp.route('/mobile/transfer', methods=['POST'])
+@login_required
+@limiter.limit('transfer')
+def mobile_transfer():
+    """Quick transfer from mobile interface"""
+    if current_user.role not in ['teacher', 'tutor', 'hod']:
+        return "Denied", 403
+    
+    receiver_id = request.form.get('receiver_id')
+    amount = int(request.form.get('amount'))
+    reason = request.form.get('reason', 'Mobile transfer')
+    
+    if current_user.balance < amount:
+        flash("Insufficient balance!", "error")
+        return redirect(url_for('mobile.mobile_dashboard'))
+    
+    receiver = User.query.filter_by(id=receiver_id, role='student').first()
+    if not receiver:
+        flash("Student not found", "error")
+        return redirect(url_for('mobile.mobile_dashboard'))
+    
+    # Verify permission
+    can_send = False
+    if current_user.tutor_of_class:
+        for cls in current_user.tutor_of_class:
+            if receiver.class_id == cls.id:
+                can_send = True
+                break
+    elif current_user.branch_id and receiver.branch_id == current_user.branch_id:
+        can_send = True
+    
+    if not can_send:
+        flash("Cannot send to this student", "error")
+        return redirect(url_for('mobile.mobile_dashboard'))
+    
+    # Perform transfer
+    current_user.balance -= amount
+    receiver.balance += amount
+    
+    tx = Transaction(
+        sender_id=current_user.id,
+        receiver_id=receiver.id,
+        amount=amount,
+        reason=reason
+    )
+    
+    db.session.add(tx)
+    db.session.commit()
+    
+    flash(f"Sent {amount} coins to {receiver.name}!", "success")
+    return redirect(url_for('mobile.mobile_dashboard'))
@@ -0,0 +1,365 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from werkzeug.security import generate_password_hash
+from models import db, User, Branch, ClassRoom, Transaction, StoreItem, RecurringAllocation, AllocationRun
+from fragment_cache import LazyQuery, load_versions, bump
+from scheduler import FREQUENCIES, first_occurrence_after
+from server_sessions import revoke_user
+from db_routing import read_only
+from datetime import datetime
+
+bp = Blueprint('principal', __name__)
+
+# --- PRINCIPAL: DASHBOARD & CREATION ---
+
+@bp.route('/principal')
+@login_required
+@read_only
+def dashboard_principal():
+    if current_user.role != 'principal': return "Denied", 403
+    
+    # Versions first, then data: cached sections only run these queries on a miss
+    load_versions()
+    branches = LazyQuery(Branch.query)
+    classes = LazyQuery(ClassRoom.query)
+    all_users = LazyQuery(User.query.filter(User.role.in_(['teacher', 'tutor', 'hod'])))
+    store_items = LazyQuery(StoreItem.query)
+    
+    total_circulation = db.session.query(db.func.sum(User.balance)).scalar() or 0
+    schedules = RecurringAllocation.query.order_by(RecurringAllocation.next_run_at).all()
+    recent_runs = AllocationRun.query.order_by(AllocationRun.executed_at.desc()).limit(10).all()
+    
+    return render_template('dashboards/principal.html', 
+                           branches=branches, 
+                           staff=all_users, 
+                           classes=classes,
+                           store_items=store_items,
+                           circulation=total_circulation,
+                           schedules=schedules,
+                           recent_runs=recent_runs)
+
+@bp.route('/principal/add_branch', methods=['POST'])
+@login_required
+def add_branch():
+    if current_user.role != 'principal': return "Denied", 403
+    name = request.form.get('name')
+    if Branch.query.filter_by(name=name).first():
+        flash('Branch already exists', 'error')
+    else:
+        db.session.add(Branch(name=name))
+        bump('branches')
+        db.session.commit()
+        flash(f'Branch "{name}" created!', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+@bp.route('/principal/add_class', methods=['POST'])
+@login_required
+def add_class():
+    if current_user.role != 'principal': return "Denied", 403
+    name = request.form.get('name')
+    branch_id = request.form.get('branch_id')
+    db.session.add(ClassRoom(name=name, branch_id=branch_id))
+    bump('classes')
+    db.session.commit()
+    flash(f'Class "{name}" added!', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+# --- UPDATE: The 'add_staff' function (HOD Fix) ---
+@bp.route('/principal/add_staff', methods=['POST'])
+@login_required
+def add_staff():
+    if current_user.role != 'principal': return "Denied", 403
+    
+    email = request.form.get('email')
+    name = request.form.get('name')
+    role = request.form.get('role')
+    branch_id = request.form.get('branch_id')
+    class_id = request.form.get('class_id')
+    password = request.form.get('password')  # FIX: Get password from form
+
+    # FIX: Validate password exists
+    if not password:
+        flash("Password is required", "error")
+        return redirect(url_for('principal.dashboard_principal'))
+
+    new_user = User(email=email, name=name, role=role, 
+                    password=generate_password_hash(password, method='pbkdf2:sha256'))
+
+    # 1. Branch Logic (Required for Teacher/HOD)
+    if role in ['teacher', 'hod'] and branch_id:
+        new_user.branch_id = int(branch_id)
+
+    db.session.add(new_user)
+    bump('staff')
+    db.session.commit()
+
+    # 2. Class Tutor Logic (Optional for HOD, Required for Tutor)
+    if (role == 'tutor' or role == 'hod') and class_id:
+        classroom = ClassRoom.query.get(int(class_id))
+        if classroom:  # FIX: Check if classroom exists
+            classroom.tutor_id = new_user.id
+            
+            if not new_user.branch_id:
+                new_user.branch_id = classroom.branch_id
+                
+            bump('staff', 'classes')
+            db.session.commit()
+
+    flash(f'User {name} created as {role}', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+
+@bp.route('/principal/add_item', methods=['POST'])
+@login_required
+def add_store_item():
+    if current_user.role != 'principal': return "Denied", 403
+    name = request.form.get('name')
+    cost = int(request.form.get('cost'))
+    stock = int(request.form.get('stock'))
+    new_item = StoreItem(name=name, cost=cost, stock=stock, creator_id=current_user.id)
+    db.session.add(new_item)
+    bump('store')
+    db.session.commit()
+    flash(f'Added "{name}" to store!', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+@bp.route('/principal/mint', methods=['POST'])
+@login_required
+def mint_coins():
+    if current_user.role != 'principal': return "Denied", 403
+    target_user = User.query.get(request.form.get('user_id'))
+    amount = int(request.form.get('amount'))
+    reason = request.form.get('reason')
+    
+    if target_user:
+        target_user.balance += amount
+        tx = Transaction(sender_id=current_user.id, receiver_id=target_user.id, 
+                         amount=amount, reason=f"Budget: {reason}")
+        db.session.add(tx)
+        db.session.commit()
+        flash(f'Allocated {amount} coins to {target_user.name}', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+# --- RECURRING ALLOCATIONS ---
+
+@bp.route('/principal/schedule', methods=['POST'])
+@login_required
+def add_schedule():
+    if current_user.role != 'principal': return "Denied", 403
+    frequency = request.form.get('frequency')
+    target_role = request.form.get('target_role')
+    branch_id = request.form.get('branch_id')
+    amount = int(request.form.get('amount'))
+    try:
+        first_run = datetime.strptime(request.form.get('first_run'), '%Y-%m-%dT%H:%M')
+    except (TypeError, ValueError):
+        flash("Invalid first run date", "error")
+        return redirect(url_for('principal.dashboard_principal'))
+
+    if frequency not in FREQUENCIES or target_role not in ['teacher', 'tutor', 'hod', 'staff'] or amount < 1:
+        flash("Invalid schedule", "error")
+        return redirect(url_for('principal.dashboard_principal'))
+
+    # A start date in the past would be back-paid on the next pass; begin at the next occurrence instead
+    anchor_day = first_run.day
+    first_run = first_occurrence_after(first_run, frequency, datetime.utcnow(), anchor_day)
+
+    schedule = RecurringAllocation(name=request.form.get('name'), creator_id=current_user.id,
+                                   branch_id=int(branch_id) if branch_id else None,
+                                   target_role=target_role, amount=amount,
+                                   reason=request.form.get('reason'), frequency=frequency,
+                                   next_run_at=first_run, anchor_day=anchor_day)
+    db.session.add(schedule)
+    db.session.commit()
+    flash(f'Scheduled "{schedule.name}" ({frequency}) starting {first_run:%d %b %Y %H:%M}', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+@bp.route('/principal/schedule/<int:id>/toggle')
+@login_required
+def toggle_schedule(id):
+    if current_user.role != 'principal': return "Denied", 403
+    schedule = RecurringAllocation.query.get(id)
+    if not schedule:
+        flash('Schedule not found', 'error')
+    else:
+        schedule.active = not schedule.active
+        if schedule.active:
+            # Resume from the next occurrence; the ones missed while paused are not back-paid
+            schedule.next_run_at = first_occurrence_after(schedule.next_run_at, schedule.frequency,
+                                                          datetime.utcnow(), schedule.anchor_day)
+        db.session.commit()
+        flash(f'"{schedule.name}" {"resumed" if schedule.active else "paused"}', 'success')
+    return redirect(url_for('principal.dashboard_principal'))
+
+# --- ALL EDIT ROUTES (User, Branch, Class, Store) ---
+
+@bp.route('/edit/user/<int:id>', methods=['GET', 'POST'])
+@login_required
+def edit_user(id):
+    # Allow principal OR tutor (for their own students) to edit
+    user = User.query.get(id)
+    
+    if not user:
+        flash("User not found", "error")
+        return redirect(url_for('auth.home'))
+    
+    # Check permissions
+    can_edit = False
+    
+    if current_user.role == 'principal':
+        can_edit = True
+    elif current_user.role == 'tutor' and user.role == 'student':
+        # Tutor can edit students in their class
+        if current_user.tutor_of_class:
+            tutor_class_ids = [c.id for c in current_user.tutor_of_class]
+            if user.class_id in tutor_class_ids:
+                can_edit = True
+    
+    if not can_edit:
+        return "Denied", 403
+    
+    branches = Branch.query.all()
+    classes = ClassRoom.query.all()
+
+    if request.method == 'POST':
+        user.name = request.form.get('name')
+        user.email = request.form.get('email')
+        new_role = request.form.get('role')
+        
+        # Handle password update
+        new_password = request.form.get('password')
+        if new_password and new_password.strip():
+            user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+        
+        # Only principal can change roles
+        if current_user.role == 'principal':
+            user.role = new_role
+            
+            # Handle Branch (For Teachers & HODs)
+            if new_role in ['teacher', 'hod']:
+                branch_id = request.form.get('branch_id')
+                user.branch_id = int(branch_id) if branch_id else None
+
+            # Handle Class Tutoring (For Tutors & HODs)
+            if new_role in ['tutor', 'hod']:
+                class_id = request.form.get('class_id')
+                
+                # Remove from old class
+                old_class = ClassRoom.query.filter_by(tutor_id=user.id).first()
+                if old_class:
+                    old_class.tutor_id = None
+                
+                # Assign to new class
+                if class_id:
+                    new_class = ClassRoom.query.get(int(class_id))
+                    new_class.tutor_id = user.id
+                    if not user.branch_id:
+                        user.branch_id = new_class.branch_id
+
+            # Handle Students
+            elif new_role == 'student':
+                class_id = request.form.get('class_id')
+                if class_id:
+                    user.class_id = int(class_id)
+                    # Update branch based on class
+                    cls = ClassRoom.query.get(int(class_id))
+                    if cls:
+                        user.branch_id = cls.branch_id
+        
+        # Tutor can only update student's class, not role
+        elif current_user.role == 'tutor' and user.role == 'student':
+            class_id = request.form.get('class_id')
+            if class_id:
+                user.class_id = int(class_id)
+                cls = ClassRoom.query.get(int(class_id))
+                if cls:
+                    user.branch_id = cls.branch_id
+
+        bump('staff', 'students', 'classes')
+        db.session.commit()
+
+        # Role/password/class may have changed: make them log in again
+        if user.id != current_user.id:
+            revoke_user(user.id)
+        flash('User updated!', 'success')
+        
+        # Redirect based on who edited
+        if current_user.role == 'principal':
+            return redirect(url_for('principal.dashboard_principal'))
+        else:
+            return redirect(url_for('teacher.dashboard_teacher'))
+        
+    return render_template('edit_item.html', item=user, type='user', branches=branches, classes=classes)
+
+@bp.route('/edit/branch/<int:id>', methods=['GET', 'POST'])
+@login_required
+def edit_branch(id):
+    if current_user.role != 'principal': return "Denied", 403
+    branch = Branch.query.get(id)
+    if request.method == 'POST':
+        branch.name = request.form.get('name')
+        bump('branches')
+        db.session.commit()
+        flash('Branch updated!', 'success')
+        return redirect(url_for('principal.dashboard_principal'))
+    return render_template('edit_item.html', item=branch, type='branch')
+
+@bp.route('/edit/class/<int:id>', methods=['GET', 'POST'])
+@login_required
+def edit_class(id):
+    if current_user.role != 'principal': return "Denied", 403
+    classroom = ClassRoom.query.get(id)
+    if request.method == 'POST':
+        classroom.name = request.form.get('name')
+        bump('classes')
+        db.session.commit()
+        flash('Class updated!', 'success')
+        return redirect(url_for('principal.dashboard_principal'))
+    return render_template('edit_item.html', item=classroom, type='class')
+
+@bp.route('/edit/store/<int:id>', methods=['GET', 'POST'])
+@login_required
+def edit_store_item(id):
+    if current_user.role != 'principal': return "Denied", 403
+    item = StoreItem.query.get(id)
+    if request.method == 'POST':
+        item.name = request.form.get('name')
+        item.cost = int(request.form.get('cost'))
+        item.stock = int(request.form.get('stock'))
+        bump('store')
+        db.session.commit()
+        flash(f'Updated {item.name}!', 'success')
+        return redirect(url_for('principal.dashboard_principal'))
+    return render_template('edit_item.html', item=item, type='store')
+
+
+# --- DELETE ROUTE (Universal) ---
+
+# Cached dashboard sections to invalidate per deleted type
+DELETE_INVALIDATES = {
+    'user': ('staff', 'students', 'classes'),
+    'branch': ('branches',),
+    'class': ('classes',),
+    'store': ('store',),
+}
+
+@bp.route('/delete/<type>/<int:id>')
+@login_required
+def delete_item(type, id):
+    if current_user.role != 'principal': return "Denied", 403
+    item = None
+    if type == 'user': item = User.query.get(id)
+    elif type == 'branch': item = Branch.query.get(id)
+    elif type == 'class': item = ClassRoom.query.get(id)
+    elif type == 'store': item = StoreItem.query.get(id)
+    
+    if item:
+        db.session.delete(item)
+        bump(*DELETE_INVALIDATES[type])
+        db.session.commit()
+        if type == 'user':
+            revoke_user(id)
+        flash(f'Deleted {type} item successfully', 'success')
+    else:
+        flash('Item not found', 'error')
+    return redirect(url_for('principal.dashboard_principal'))
@@ -0,0 +1,62 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, send_file
+from flask_login import login_required, current_user
+from models import db, Transaction, StoreItem, Receipt
+from ratelimit import limiter
+from fragment_cache import bump
+from db_routing import read_only
+from archive import transaction_history
+import secrets
+
+bp = Blueprint('student', __name__)
+
+# --- STUDENT ROUTES ---
+
+@bp.route('/student')
+@login_required
+@read_only
+def dashboard_student():
+    if current_user.role != 'student': return "Denied", 403
+    my_txs = transaction_history(user_id=current_user.id, limit=10)
+    store_items = StoreItem.query.filter(StoreItem.stock > 0).all()
+    my_receipts = Receipt.query.filter_by(student_id=current_user.id).order_by(Receipt.timestamp.desc()).all()
+    return render_template('dashboards/student.html', transactions=my_txs, store_items=store_items, receipts=my_receipts)
+
+@bp.route('/student/qr_image')
+@login_required
+def qr_image():
+    # qrcode pulls in Pillow; import lazily so worker boot doesn't pay for it
+    import qrcode
+    from io import BytesIO
+
+    data = f"USER-{current_user.id}"
+    img = qrcode.make(data)
+    buf = BytesIO()
+    img.save(buf)
+    buf.seek(0)
+    return send_file(buf, mimetype='image/png')
+
+@bp.route('/student/buy/<int:item_id>')
+@login_required
+@limiter.limit('buy')
+def buy_item(item_id):
+    if current_user.role != 'student': return "Denied", 403
+    item = StoreItem.query.get(item_id)
+    if not item or item.stock < 1:
+        flash("Out of stock!", "error")
+        return redirect(url_for('student.dashboard_student'))
+    if current_user.balance < item.cost:
+        flash("Insufficient funds!", "error")
+        return redirect(url_for('student.dashboard_student'))
+    
+    current_user.balance -= item.cost
+    item.stock -= 1
+    code = secrets.token_hex(3).upper()
+    receipt = Receipt(student_id=current_user.id, item_id=item.id, unique_code=code, status='PENDING')
+    tx = Transaction(sender_id=current_user.id, receiver_id=1, amount=item.cost, reason=f"Store: {item.name}")
+    
+    db.session.add(receipt)
+    db.session.add(tx)
+    bump('store')
+    db.session.commit()
+    flash(f"Purchased {item.name}! Code: {code}", "success")
+    return redirect(url_for('student.dashboard_student'))
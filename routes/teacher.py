@@ -0,0 +1,237 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from werkzeug.security import generate_password_hash
+from models import db, User, Branch, ClassRoom, Transaction
+from ratelimit import limiter
+from fragment_cache import load_versions, bump
+from db_routing import read_only
+from archive import transaction_history, with_users
+
+bp = Blueprint('teacher', __name__)
+
+# --- TEACHER ROUTES ---
+
+@bp.route('/teacher')
+@login_required
+@read_only
+def dashboard_teacher():
+    if current_user.role not in ['teacher', 'tutor', 'hod']: 
+        return "Denied", 403
+    
+    load_versions()
+
+    # Get transactions
+    my_txs = with_users(transaction_history(user_id=current_user.id, limit=20, sent_only=True))
+    
+    # Determine all capabilities based on actual assignments, not just role field
+    is_tutor = bool(current_user.tutor_of_class and len(current_user.tutor_of_class) > 0)
+    is_hod = bool(current_user.branch_id and current_user.role == 'hod')
+    is_subject_teacher = bool(current_user.branch_id)
+    
+    # Get branch info
+    my_branch = None
+    if current_user.branch_id:
+        my_branch = Branch.query.get(current_user.branch_id)
+    
+    # Get students based on capabilities
+    branch_students = []  # For subject teachers/HODs - all students in branch
+    class_students = []   # For tutors - students in specific classes
+    
+    if is_tutor:
+        # Get students from tutor's classes
+        for cls in current_user.tutor_of_class:
+            students = User.query.filter_by(role='student', class_id=cls.id).all()
+            class_students.extend(students)
+    
+    if is_subject_teacher or is_hod:
+        # Get all students in the branch
+        if my_branch:
+            branch_classes = ClassRoom.query.filter_by(branch_id=my_branch.id).all()
+            class_ids = [c.id for c in branch_classes]
+            if class_ids:
+                branch_students = User.query.filter(
+                    User.role == 'student',
+                    User.class_id.in_(class_ids)
+                ).all()
+    
+    # Remove duplicates
+    seen = set()
+    unique_branch = []
+    for s in branch_students:
+        if s.id not in seen:
+            seen.add(s.id)
+            unique_branch.append(s)
+    branch_students = unique_branch
+    
+    seen = set()
+    unique_class = []
+    for s in class_students:
+        if s.id not in seen:
+            seen.add(s.id)
+            unique_class.append(s)
+    class_students = unique_class
+    
+    # For HOD: Get branch staff (teachers and tutors)
+    branch_staff = []
+    if is_hod and my_branch:
+        branch_staff = User.query.filter(
+            User.branch_id == my_branch.id,
+            User.id != current_user.id,
+            User.role.in_(['teacher', 'tutor'])
+        ).all()
+    
+    # For HOD: Get branch stats
+    branch_stats = {}
+    if is_hod and my_branch:
+        total_students = len(branch_students)
+        total_teachers = len(branch_staff)
+        total_classes = ClassRoom.query.filter_by(branch_id=my_branch.id).count()
+        branch_balance = sum(s.balance for s in branch_students)
+        branch_stats = {
+            'students': total_students,
+            'teachers': total_teachers,
+            'classes': total_classes,
+            'balance': branch_balance
+        }
+    
+    return render_template('dashboards/teacher.html', 
+                         transactions=my_txs,
+                         branch_students=branch_students,
+                         class_students=class_students,
+                         branch_staff=branch_staff,
+                         branch_stats=branch_stats,
+                         my_branch=my_branch,
+                         is_tutor=is_tutor,
+                         is_hod=is_hod,
+                         is_subject_teacher=is_subject_teacher)
+
+
+@bp.route('/teacher/transfer', methods=['POST'])
+@login_required
+@limiter.limit('transfer')
+def transfer_coins():
+    if current_user.role not in ['teacher', 'tutor', 'hod']:
+        return "Denied", 403
+        
+    receiver_id = request.form.get('receiver_id') 
+    amount = int(request.form.get('amount'))
+    reason = request.form.get('reason')
+    
+    if current_user.balance < amount:
+        flash("Insufficient Budget!", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+        
+    receiver = User.query.filter_by(id=receiver_id, role='student').first()
+    if not receiver:
+        flash("Student not found", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+    
+    # Verify teacher can send to this student
+    can_send = False
+    
+    # Check if tutor of student's class
+    if current_user.tutor_of_class:
+        for cls in current_user.tutor_of_class:
+            if receiver.class_id == cls.id:
+                can_send = True
+                break
+    
+    # Check if same branch (teacher/HOD)
+    if not can_send and current_user.branch_id:
+        if receiver.branch_id == current_user.branch_id:
+            can_send = True
+    
+    if not can_send:
+        flash("You cannot send coins to this student", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+
+    current_user.balance -= amount
+    receiver.balance += amount
+    
+    tx = Transaction(
+        sender_id=current_user.id, 
+        receiver_id=receiver.id, 
+        amount=amount, 
+        reason=reason
+    )
+    
+    db.session.add(tx)
+    db.session.commit()
+    
+    flash(f"Sent {amount} coins to {receiver.name}", "success")
+    return redirect(url_for('teacher.dashboard_teacher'))
+
+
+@bp.route('/hod/allocate', methods=['POST'])
+@login_required
+def hod_allocate():
+    """HOD can allocate coins to teachers in their branch"""
+    if current_user.role != 'hod':
+        return "Denied", 403
+    
+    teacher_id = request.form.get('teacher_id')
+    amount = int(request.form.get('amount'))
+    reason = request.form.get('reason')
+    
+    # Verify teacher is in HOD's branch
+    teacher = User.query.filter_by(id=teacher_id, branch_id=current_user.branch_id).first()
+    if not teacher:
+        flash("Teacher not found in your branch", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+    
+    if current_user.balance < amount:
+        flash("Insufficient balance", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+    
+    current_user.balance -= amount
+    teacher.balance += amount
+    
+    tx = Transaction(
+        sender_id=current_user.id,
+        receiver_id=teacher.id,
+        amount=amount,
+        reason=f"HOD Allocation: {reason}"
+    )
+    
+    db.session.add(tx)
+    db.session.commit()
+    
+    flash(f"Allocated {amount} coins to {teacher.name}", "success")
+    return redirect(url_for('teacher.dashboard_teacher'))
+
+
+@bp.route('/tutor/add_student', methods=['POST'])
+@login_required
+def tutor_add_student():
+    # Check if user manages ANY class
+    if not current_user.tutor_of_class:
+        flash("You are not a Class Tutor!", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+    
+    # Get the first class they manage (assuming 1 class per tutor)
+    my_class = current_user.tutor_of_class[0]
+    
+    name = request.form.get('name')
+    email = request.form.get('email')
+    password = request.form.get('password')  # ADD THIS LINE
+    
+    # Validate password exists
+    if not password:
+        flash("Password is required!", "error")
+        return redirect(url_for('teacher.dashboard_teacher'))
+    
+    if User.query.filter_by(email=email).first():
+        flash("Email already exists!", "error")
+    else:
+        # Create Student linked to Tutor's Class & Branch
+        new_student = User(name=name, email=email, role='student',
+                           password=generate_password_hash(password, method='pbkdf2:sha256'),  # USE FORM PASSWORD
+                           class_id=my_class.id,
+                           branch_id=my_class.branch_id)
+        
+        db.session.add(new_student)
+        bump('students')
+        db.session.commit()
+        flash(f"Added {name} to Class {my_class.name}. Password set successfully.", "success")
+        
+    return redirect(url_for('teacher.dashboard_teacher'))
@@ -0,0 +1,164 @@
+"""Recurring coin allocations ("every Monday give each teacher in CS 500 coins").
+
+A daemon thread per worker wakes every SCHEDULER_POLL_SECONDS and applies
+every due occurrence of every active RecurringAllocation, oldest first, so
+occurrences missed while the app was down are caught up (at most
+SCHEDULER_MAX_CATCHUP per schedule per pass). Occurrences that fell while a
+schedule was paused are skipped when it is resumed, not paid out.
+
+Each occurrence is one transaction: an AllocationRun row, one bulk
+INSERT ... SELECT into Transaction and one UPDATE of the recipients'
+balances. AllocationRun is unique on (schedule_id, scheduled_for), so when
+several workers race for the same occurrence only one commit succeeds.
+
+    flask --app wsgi run-allocations     # one pass, e.g. from cron
+"""
+import calendar
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User, Transaction, RecurringAllocation, AllocationRun
+
+log = logging.getLogger(__name__)
+
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+STAFF_ROLES = ('teacher', 'tutor', 'hod')
+
+
+def next_occurrence(when, frequency, anchor_day=None):
+    """The occurrence after ``when``. Monthly runs land on ``anchor_day`` (the
+    first run's day), clamped to short months, so Jan 31 -> Feb 28 -> Mar 31."""
+    if frequency == 'daily':
+        return when + timedelta(days=1)
+    if frequency == 'weekly':
+        return when + timedelta(days=7)
+    if frequency == 'monthly':
+        year, month = (when.year + 1, 1) if when.month == 12 else (when.year, when.month + 1)
+        day = min(anchor_day or when.day, calendar.monthrange(year, month)[1])
+        return when.replace(year=year, month=month, day=day)
+    raise ValueError(f"Unknown frequency {frequency!r}")
+
+def first_occurrence_after(when, frequency, now, anchor_day=None):
+    """Skip occurrences up to ``now``, e.g. the ones that fell while a schedule was paused."""
+    while when <= now:
+        when = next_occurrence(when, frequency, anchor_day)
+    return when
+
+def _recipients(schedule):
+    roles = STAFF_ROLES if schedule.target_role == 'staff' else (schedule.target_role,)
+    cond = User.role.in_(roles)
+    if schedule.branch_id:
+        cond = cond & (User.branch_id == schedule.branch_id)
+    return cond
+
+# --- EXECUTION ---
+
+def apply_run(schedule, scheduled_for):
+    """Apply one occurrence as a single batch. Returns the AllocationRun, or None if
+    already applied or the schedule has been paused."""
+    recipients = _recipients(schedule)
+    now = datetime.utcnow()
+    run = AllocationRun(schedule_id=schedule.id, scheduled_for=scheduled_for, executed_at=now)
+    try:
+        db.session.add(run)
+        db.session.flush()
+        # Checked after the flush, i.e. holding the write lock, so a pause committed meanwhile is seen
+        if not db.session.scalar(select(RecurringAllocation.active)
+                                 .where(RecurringAllocation.id == schedule.id)):
+            db.session.rollback()
+            return None
+
+        reason = f"Scheduled: {schedule.reason or schedule.name} ({scheduled_for:%d %b %Y})"
+        tx = Transaction.__table__
+        db.session.execute(insert(tx).from_select(
+            ['sender_id', 'receiver_id', 'amount', 'reason', 'timestamp'],
+            select(literal(schedule.creator_id), User.id, literal(schedule.amount),
+                   literal(reason), literal(now)).where(recipients)))
+        result = db.session.execute(
+            update(User).where(recipients).values(balance=User.balance + schedule.amount)
+            .execution_options(synchronize_session=False))
+
+        run.recipients = result.rowcount
+        run.total = result.rowcount * schedule.amount
+        db.session.commit()
+        return run
+    except IntegrityError:
+        # Another worker applied this occurrence first
+        db.session.rollback()
+        return None
+
+def run_due(now=None):
+    """Apply all due occurrences. Returns the AllocationRuns applied by this call."""
+    now = now or datetime.utcnow()
+    max_catchup = current_app.config['SCHEDULER_MAX_CATCHUP']
+    applied = []
+    due = RecurringAllocation.query.filter(RecurringAllocation.active.is_(True),
+                                           RecurringAllocation.next_run_at <= now).all()
+    for schedule in due:
+        for _ in range(max_catchup):
+            # Re-read before every occurrence: it may have been paused or advanced meanwhile
+            db.session.refresh(schedule)
+            scheduled_for = schedule.next_run_at
+            if not schedule.active or scheduled_for > now:
+                break
+            run = apply_run(schedule, scheduled_for)
+            if run:
+                applied.append(run)
+            # Advance only from the occurrence we just handled, so two workers can't skip one;
+            # a paused schedule keeps its next_run_at for toggle_schedule to roll forward
+            db.session.execute(
+                update(RecurringAllocation)
+                .where(RecurringAllocation.id == schedule.id,
+                       RecurringAllocation.active.is_(True),
+                       RecurringAllocation.next_run_at == scheduled_for)
+                .values(next_run_at=next_occurrence(scheduled_for, schedule.frequency, schedule.anchor_day)))
+            db.session.commit()
+    return applied
+
+# --- BACKGROUND WORKER ---
+
+def _worker(app, stop):
+    interval = app.config['SCHEDULER_POLL_SECONDS']
+    while not stop.wait(interval):
+        with app.app_context():
+            try:
+                for run in run_due():
+                    log.info("allocation %s for %s: %s coins to %s users",
+                             run.schedule_id, run.scheduled_for, run.total, run.recipients)
+            except Exception:
+                log.exception("recurring allocation pass failed")
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+def start(app):
+    stop = threading.Event()
+    thread = threading.Thread(target=_worker, args=(app, stop), name='allocation-scheduler', daemon=True)
+    thread.start()
+    app.extensions['scheduler'] = (thread, stop)
+    return stop
+
+def init_app(app):
+    app.config.setdefault('SCHEDULER_ENABLED', False)
+    app.config.setdefault('SCHEDULER_POLL_SECONDS', 60)
+    app.config.setdefault('SCHEDULER_MAX_CATCHUP', 52)
+    app.cli.add_command(run_allocations_command)
+    if app.config['SCHEDULER_ENABLED']:
+        start(app)
+
+# --- CLI ---
+
+@click.command('run-allocations')
+def run_allocations_command():
+    """Apply all due recurring allocations once."""
+    runs = run_due()
+    for run in runs:
+        click.echo(f"{run.schedule.name} @ {run.scheduled_for}: {run.total} coins to {run.recipients} users")
+    if not runs:
+        click.echo("Nothing due.")
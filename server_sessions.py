@@ -0,0 +1,339 @@
+"""Optional server-side sessions with a compact cookie.
+
+With SESSION_BACKEND = 'memory' or 'sqlalchemy' the session cookie holds only
+``<sid>.<gen>``, so flashes and Flask-Login state no longer ride along on
+every request (qr_image, static files, ...). 'cookie' keeps Flask's default
+signed-cookie sessions.
+
+Each worker keeps its sessions in a local cache. ``gen`` is bumped on every
+change and re-sent in the cookie, so a cached copy is only trusted while its
+gen matches the cookie; otherwise (a change made by another worker) the row
+is re-read. An unchanged session therefore costs no database lookup.
+
+Changed sessions are written through immediately, as a compare-and-swap on
+``gen``: if another request changed the session first, the latest copy is
+re-read, this request's changes are re-applied on top of it and the write
+is retried, so two workers never both publish their own ``gen + 1``. The
+sliding-expiry refresh that every request would otherwise write is queued
+and flushed in one batch by a background sweep, which also purges expired
+sessions and picks up forced logouts (revoke_user) made by other workers.
+The sweep thread is started by the first request each process serves, so it
+also runs in workers forked by ``gunicorn --preload``.
+
+The sid is replaced whenever the logged-in user changes (login, logout,
+switching accounts), so a sid planted in a browser before login is worthless
+afterwards (session fixation).
+
+'memory' keeps everything in the worker process: use it with a single
+worker or sticky routing only.
+"""
+import copy
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, ServerSession, SessionRevocation
+
+serializer = TaggedJSONSerializer()
+
+
+class ServerSideSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, gen=0, expires=None, new=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.gen = gen
+        self.expires = expires
+        self.new = new
+        # Snapshot as loaded, to re-apply only this request's changes after a write conflict
+        self.original = copy.deepcopy(dict(initial or {}))
+
+# --- STORES ---
+
+class MemorySessionStore:
+    """Sessions held in this process only. Also the read cache for SQLSessionStore."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # sid -> [gen, data, user_id, expires]
+        self._lock = threading.Lock()
+
+    def load(self, sid, gen):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None or entry[3] <= datetime.utcnow():
+                return None
+            self._entries.move_to_end(sid)
+            return entry[0], dict(entry[1]), entry[3]
+
+    def put(self, sid, gen, data, user_id, expires):
+        with self._lock:
+            self._put(sid, gen, data, user_id, expires)
+
+    def _put(self, sid, gen, data, user_id, expires):
+        self._entries[sid] = [gen, dict(data), user_id, expires]
+        self._entries.move_to_end(sid)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self, sid, gen, data, user_id, expires):
+        """Store ``data`` if the session is still at ``gen`` (0 = new). Returns the new gen, or None."""
+        with self._lock:
+            entry = self._entries.get(sid)
+            if (entry[0] if entry else 0) != gen:
+                return None
+            self._put(sid, gen + 1, data, user_id, expires)
+            return gen + 1
+
+    def touch(self, sid, expires):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry:
+                entry[3] = expires
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            for sid in [s for s, e in self._entries.items() if e[2] == user_id]:
+                del self._entries[sid]
+
+    def sweep(self):
+        now = datetime.utcnow()
+        with self._lock:
+            for sid in [s for s, e in self._entries.items() if e[3] <= now]:
+                del self._entries[sid]
+
+
+class SQLSessionStore:
+    """ServerSession rows in the app database, fronted by a per-worker cache."""
+
+    def __init__(self, max_entries=10000):
+        self._cache = MemorySessionStore(max_entries)
+        self._pending_touches = {}
+        self._pending_lock = threading.Lock()
+        self._last_revocation_check = datetime.utcnow()
+
+    def load(self, sid, gen):
+        cached = self._cache.load(sid, gen)
+        if cached and cached[0] == gen:
+            return cached
+
+        with db.engine.connect() as conn:
+            row = conn.execute(select(ServerSession.gen, ServerSession.data, ServerSession.user_id,
+                                      ServerSession.expires)
+                               .where(ServerSession.sid == sid)).first()
+        if row is None or row.expires <= datetime.utcnow():
+            self._cache.delete(sid)
+            return None
+        data = serializer.loads(row.data)
+        self._cache.put(sid, row.gen, data, row.user_id, row.expires)
+        return row.gen, data, row.expires
+
+    def save(self, sid, gen, data, user_id, expires):
+        """Write ``data`` if the row is still at ``gen`` (0 = new). Returns the new gen, or None."""
+        values = dict(data=serializer.dumps(data), user_id=user_id, expires=expires)
+        try:
+            with db.engine.begin() as conn:
+                if gen:
+                    updated = conn.execute(update(ServerSession)
+                                           .where(ServerSession.sid == sid, ServerSession.gen == gen)
+                                           .values(gen=ServerSession.gen + 1, **values))
+                    if not updated.rowcount:
+                        return None
+                else:
+                    conn.execute(insert(ServerSession).values(sid=sid, gen=1, **values))
+        except IntegrityError:
+            return None
+        with self._pending_lock:
+            self._pending_touches.pop(sid, None)
+        self._cache.put(sid, gen + 1, data, user_id, expires)
+        return gen + 1
+
+    def touch(self, sid, expires):
+        self._cache.touch(sid, expires)
+        with self._pending_lock:
+            self._pending_touches[sid] = expires
+
+    def delete(self, sid):
+        self._cache.delete(sid)
+        with db.engine.begin() as conn:
+            conn.execute(delete(ServerSession).where(ServerSession.sid == sid))
+
+    def revoke_user(self, user_id):
+        self._cache.revoke_user(user_id)
+        with db.engine.begin() as conn:
+            conn.execute(delete(ServerSession).where(ServerSession.user_id == user_id))
+            conn.execute(insert(SessionRevocation).values(user_id=user_id, revoked_at=datetime.utcnow()))
+
+    def sweep(self):
+        now = datetime.utcnow()
+        with self._pending_lock:
+            touches, self._pending_touches = self._pending_touches, {}
+
+        with db.engine.begin() as conn:
+            for sid, expires in touches.items():
+                conn.execute(update(ServerSession).where(ServerSession.sid == sid).values(expires=expires))
+            conn.execute(delete(ServerSession).where(ServerSession.expires <= now))
+
+            revoked = conn.execute(select(SessionRevocation.user_id)
+                                   .where(SessionRevocation.revoked_at >= self._last_revocation_check)).scalars().all()
+            conn.execute(delete(SessionRevocation).where(SessionRevocation.revoked_at < now - timedelta(days=1)))
+        # Overlap with the previous window; evicting twice is harmless
+        self._last_revocation_check = now - timedelta(seconds=1)
+
+        for user_id in set(revoked):
+            self._cache.revoke_user(user_id)
+        self._cache.sweep()
+
+# --- INTERFACE ---
+
+class ServerSideSessionInterface(SessionInterface):
+    save_attempts = 3
+
+    def __init__(self, store):
+        self.store = store
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+
+    def _ensure_sweeper(self, app):
+        # Per process: a thread started in create_app() would only exist in a --preload master
+        if self._sweeper_pid == os.getpid():
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid != os.getpid():
+                stop = threading.Event()
+                threading.Thread(target=_sweeper, args=(app, self.store, stop),
+                                 name='session-sweeper', daemon=True).start()
+                app.extensions['server_sessions'] = (self.store, stop)
+                self._sweeper_pid = os.getpid()
+
+    def _parse_cookie(self, value):
+        sid, _, gen = (value or '').partition('.')
+        if len(sid) != 32 or not gen.isdigit():
+            return None, 0
+        return sid, int(gen)
+
+    def open_session(self, app, request):
+        self._ensure_sweeper(app)
+        sid, gen = self._parse_cookie(request.cookies.get(self.get_cookie_name(app)))
+        if sid:
+            record = self.store.load(sid, gen)
+            if record:
+                gen, data, expires = record
+                return ServerSideSession(data, sid=sid, gen=gen, expires=expires)
+        return ServerSideSession(sid=secrets.token_hex(16), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+
+        now = datetime.utcnow()
+        ttl = app.config['SESSION_TTL']
+        if session.modified:
+            data = dict(session)
+            if not session.new and _user_id(data) != _user_id(session.original):
+                # Login, logout or user switch: never let a pre-existing (possibly planted) sid
+                # carry the new identity. Drop the old row and continue under a fresh sid.
+                self.store.delete(session.sid)
+                session.sid = secrets.token_hex(16)
+                session.gen = 0
+                session.original = {}
+            for _ in range(self.save_attempts):
+                gen = self.store.save(session.sid, session.gen, data, _user_id(data), now + ttl)
+                if gen is not None:
+                    session.gen = gen
+                    break
+                # Another request changed the session since we loaded it
+                latest = self.store.load(session.sid, None)
+                if latest is None:
+                    # Deleted meanwhile (logout, revoke_user, expiry): don't bring it back
+                    response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                           samesite=samesite, httponly=httponly)
+                    return
+                session.gen, latest_data, _ = latest
+                data = _merge(session.original, dict(session), latest_data)
+            else:
+                app.logger.warning("session %s: gave up after %d write conflicts", session.sid, self.save_attempts)
+                return
+            response.set_cookie(name, f"{session.sid}.{session.gen}",
+                                expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path,
+                                secure=secure, samesite=samesite)
+            response.vary.add('Cookie')
+        elif session.expires - now < ttl - app.config['SESSION_TOUCH_INTERVAL']:
+            # Sliding expiry; written in batches by the sweep
+            self.store.touch(session.sid, now + ttl)
+
+
+def _merge(original, current, latest):
+    """Re-apply the keys a request set or removed (``original`` -> ``current``) onto ``latest``."""
+    merged = dict(latest)
+    for key in original.keys() - current.keys():
+        merged.pop(key, None)
+    for key, value in current.items():
+        if key not in original or original[key] != value:
+            merged[key] = value
+    return merged
+
+def _user_id(data):
+    user_id = data.get('_user_id')
+    return int(user_id) if user_id is not None else None
+
+# --- SETUP ---
+
+def revoke_user(user_id):
+    """Log ``user_id`` out everywhere (no-op with cookie sessions)."""
+    interface = current_app.session_interface
+    if isinstance(interface, ServerSideSessionInterface):
+        interface.store.revoke_user(user_id)
+
+def _sweeper(app, store, stop):
+    while not stop.wait(app.config['SESSION_SWEEP_SECONDS']):
+        with app.app_context():
+            try:
+                store.sweep()
+            except Exception:
+                app.logger.exception("session sweep failed")
+
+def init_app(app):
+    app.config.setdefault('SESSION_BACKEND', 'cookie')
+    app.config.setdefault('SESSION_TTL', timedelta(hours=12))
+    app.config.setdefault('SESSION_TOUCH_INTERVAL', timedelta(minutes=5))
+    app.config.setdefault('SESSION_SWEEP_SECONDS', 10)
+
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'cookie':
+        return
+    if backend == 'memory':
+        store = MemorySessionStore()
+    elif backend == 'sqlalchemy':
+        store = SQLSessionStore()
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}")
+
+    app.session_interface = ServerSideSessionInterface(store)
+    app.extensions['server_sessions'] = (store, None)  # stop event set once the sweeper starts
@@ -0,0 +1,5 @@
+# Entry point for gunicorn:  gunicorn -w 4 wsgi:app
+# Create the schema first, once:  flask --app wsgi init-db
+from app import create_app
+
+app = create_app()